@@ -0,0 +1,8 @@
+-- Composite index for listing a user's files within a notebook
+-- (FileRepository.list_by_user_id / list_content_rows_by_notebook filter on both columns).
+-- user_id leads, so user-only listings can use it as well.
+
+-- CONCURRENTLY avoids locking the files table against writes while the index builds.
+-- It cannot run inside a transaction, so this migration holds this single statement.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS file_user_notebook_idx
+ON files (user_id, notebook_id);
@@ -0,0 +1,31 @@
+-- Make sure every table hanging off a notebook has an ON DELETE CASCADE foreign key,
+-- so a notebook can be deleted with a single DELETE (NotebookRepository.delete_by_id)
+-- and Postgres removes its children.
+-- files.notebook_id and chat.notebook_id were added in V1 (and whiteboards created in V5)
+-- without a constraint; tables created by SQLAlchemy's create_all already have one.
+
+-- Constraints are only added where no foreign key on notebook_id exists yet.
+-- NOT VALID skips checking existing rows (rows left behind by earlier notebook deletes
+-- would otherwise fail the migration) but still enforces and cascades from now on.
+DO $$
+DECLARE
+    child_table TEXT;
+BEGIN
+    FOREACH child_table IN ARRAY ARRAY['files', 'chat', 'whiteboards', 'folders', 'notebook_default_models', 'propositions', 'tasks']
+    LOOP
+        IF to_regclass(child_table) IS NOT NULL AND NOT EXISTS (
+            SELECT 1
+            FROM pg_constraint c
+            JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+            WHERE c.contype = 'f'
+              AND c.conrelid = child_table::regclass
+              AND c.confrelid = 'notebooks'::regclass
+              AND a.attname = 'notebook_id'
+        ) THEN
+            EXECUTE format(
+                'ALTER TABLE %I ADD CONSTRAINT %I FOREIGN KEY (notebook_id) REFERENCES notebooks(id) ON DELETE CASCADE NOT VALID',
+                child_table, 'fk_' || child_table || '_notebook_id'
+            );
+        END IF;
+    END LOOP;
+END $$;
@@ -0,0 +1,10 @@
+-- Add a GIN index on files.processing_result for JSONB containment queries
+-- jsonb_path_ops only supports the @> operator, but the index is smaller and faster
+-- than the default jsonb_ops. Filters must use the containment form to hit it:
+--   processing_result @> '{"transcription": "..."}'
+-- rather than processing_result->>'transcription' = '...'.
+
+-- CONCURRENTLY avoids locking the files table against writes while the index builds.
+-- It cannot run inside a transaction, so this migration holds this single statement.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS file_processing_result_idx
+ON files USING GIN (processing_result jsonb_path_ops);
@@ -0,0 +1,7 @@
+-- Add an index backing the assistant lookup by graph_id
+-- Every AI request resolves its assistant with WHERE graph_id = :graph_id, which
+-- otherwise scans the table. Metadata is never filtered by specific keys, so the
+-- existing GIN index (assistant_metadata_idx) is kept as-is for ad-hoc queries.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS assistant_graph_id_idx
+ON assistant (graph_id);
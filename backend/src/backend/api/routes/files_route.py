@@ -1,8 +1,6 @@
 # backend/api/routes/files_route.py
 
-import os
 import uuid
-import shutil
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, UploadFile, File as FastAPIFile, HTTPException
 from fastapi.responses import StreamingResponse
@@ -78,9 +76,8 @@ async def upload_file(
             detail=f"File size exceeds maximum allowed size"
         )
 
-    # Temporary file tracking for cleanup
-    temp_file_path = None
-    temp_dir_to_remove = None
+    # Converted audio (spooled ffmpeg output) tracking for cleanup
+    converted_stream = None
 
     try:
         final_filename = file.filename
@@ -93,23 +90,16 @@ async def upload_file(
             print(f"   > Detected audio upload: {file.filename} ({file.content_type})")
 
             # Convert to WAV using backend service
-            # This returns a path on disk to the converted file
-            temp_file_path, new_filename, new_content_type = await file_service.convert_to_wav(
+            # On failure this falls back to the original upload (application/octet-stream)
+            converted_stream, new_filename, new_content_type = await file_service.convert_to_wav(
                 file.file,
                 file.filename
             )
 
-            # Identify the directory to clean up later
-            if temp_file_path:
-                temp_dir_to_remove = os.path.dirname(temp_file_path)
-
-            # Update variables to point to the converted file
+            # Update variables to point to the converted stream
             final_filename = new_filename
             final_content_type = new_content_type
-
-            # Open the converted file on disk to stream to S3
-            # We must open in binary read mode
-            file_object_to_upload = open(temp_file_path, "rb")
+            file_object_to_upload = converted_stream
         # --------------------------------------
 
         unique_filename = file_service.generate_unique_filename(final_filename)
@@ -121,16 +111,12 @@ async def upload_file(
             content_type=final_content_type
         )
 
-        # Close the local handle if it was a converted file
-        if temp_file_path and hasattr(file_object_to_upload, 'close'):
-            file_object_to_upload.close()
-
         # 2. Handle Content Storage for Text Files
         content_to_store = None
         if final_content_type and final_content_type.startswith('text/'):
             try:
                 # If we converted, we don't have text content logic, but for safety:
-                if not temp_file_path:
+                if file_object_to_upload is file.file:
                     await file.seek(0)
                     file_content = await file.read()
                     content_to_store = file_content.decode('utf-8')
@@ -230,12 +216,12 @@ async def upload_file(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
     finally:
-        # Cleanup temporary conversion directory
-        if temp_dir_to_remove and os.path.exists(temp_dir_to_remove):
+        # Release the spooled WAV output (the fallback is the upload itself, closed by FastAPI)
+        if converted_stream is not None and converted_stream is not file.file:
             try:
-                shutil.rmtree(temp_dir_to_remove)
+                converted_stream.close()
             except Exception as e:
-                print(f"Error cleaning up temp directory {temp_dir_to_remove}: {e}")
+                print(f"Error cleaning up audio conversion: {e}")
 
 
 @router.get("/{notebook_id}")
@@ -298,15 +284,12 @@ async def download_file_proxy(
         # 2. Get stream from S3 via service
         s3_stream = await file_service.get_file_stream_from_s3(file_record.unique_filename)
 
-        # 3. Create generator for StreamingResponse
-        # Note: boto3 stream is synchronous, ideally we chunk it
-        def iterfile():
+        # 3. Create async generator for StreamingResponse
+        async def iterfile():
             # chunk size 4KB
-            while True:
-                chunk = s3_stream.read(4096)
-                if not chunk:
-                    break
-                yield chunk
+            async with s3_stream:
+                async for chunk in s3_stream.iter_chunks(4096):
+                    yield chunk
 
         # 4. Prepare headers
         media_type = file_record.content_type or "application/octet-stream"
@@ -561,8 +544,8 @@ async def export_notebook(
     The ZIP file maintains the folder structure and includes all files.
     """
     try:
-        # Generate ZIP file
-        zip_buffer = await file_service.export_notebook_as_zip(
+        # Fetch the notebook contents; the archive itself is built while it is streamed
+        zip_stream = await file_service.export_notebook_as_zip(
             user_id=str(current_user.user_id),
             notebook_id=notebook_id,
             notebook_name=notebook_name
@@ -572,18 +555,8 @@ async def export_notebook(
         safe_notebook_name = file_service._sanitize_filename(notebook_name)
         filename = f"{safe_notebook_name}.zip"
 
-        # Create streaming response
-        def iterzip():
-            # Read in chunks to avoid memory issues
-            chunk_size = 8192
-            while True:
-                chunk = zip_buffer.read(chunk_size)
-                if not chunk:
-                    break
-                yield chunk
-
         return StreamingResponse(
-            iterzip(),
+            zip_stream,
             media_type="application/zip",
             headers={
                 "Content-Disposition": f'attachment; filename="{filename}"'
@@ -7,10 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 import redis.asyncio as redis
-import boto3
-from botocore.client import Config
 
 from backend.databases.postgres_db import AsyncPostgreSQLDatabase
+from backend.databases.s3_client import AsyncS3Client
 from backend.repositories.app_settings_repository import AppSettingsRepository
 from backend.repositories.assistant_repository import AssistantRepository
 from backend.repositories.chat_model_repository import ChatModelRepository
@@ -51,17 +50,6 @@ from backend.services.notebook_template_service import NotebookTemplateService
 load_dotenv()
 
 
-def create_s3_client():
-    return boto3.client(
-        's3',
-        endpoint_url=os.getenv("S3_ENDPOINT_URL", "http://seaweedfs:8333"),
-        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "any"),
-        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "any"),
-        config=Config(signature_version='s3v4'),
-        region_name='us-east-1'
-    )
-
-
 def create_fernet() -> Fernet:
     encryption_key = os.getenv("ENCRYPTION_KEY")
     if not encryption_key:
@@ -81,7 +69,7 @@ class Container(containers.DeclarativeContainer):
 
     redis_client = providers.Singleton(create_redis_client)
 
-    s3_client = providers.Singleton(create_s3_client)
+    s3_client = providers.Singleton(AsyncS3Client)
 
     chat_repository = providers.Factory(ChatRepository)
     thread_repository = providers.Factory(ThreadRepository)
@@ -106,7 +94,8 @@ class Container(containers.DeclarativeContainer):
         model_api_repository=model_api_repository,
     )
 
-    litellm_service = providers.Factory(
+    # Singleton so every request shares the same HTTP connection pool
+    litellm_service = providers.Singleton(
         LiteLLMService
     )
 
@@ -0,0 +1,57 @@
+import os
+import asyncio
+from contextlib import AsyncExitStack
+
+import aioboto3
+from aiobotocore.config import AioConfig
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Connections kept by the shared client (botocore defaults to 10, which would cap bulk downloads)
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+
+
+class AsyncS3Client:
+    """
+    Asynchronous S3 (SeaweedFS) client manager.
+    Lazily opens a single aioboto3 client and keeps it open, so every request shares
+    the same connection pool instead of paying a client/TLS setup per call.
+    An instance of this class should be treated as a singleton for the app's lifetime.
+    """
+    def __init__(self, endpoint_url: str = None):
+        self.endpoint_url = endpoint_url or os.getenv("S3_ENDPOINT_URL", "http://seaweedfs:8333")
+        self.session = aioboto3.Session(
+            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID", "any"),
+            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY", "any"),
+            region_name='us-east-1'
+        )
+        self._client = None
+        self._exit_stack = None
+        self._lock = asyncio.Lock()
+
+    async def get_client(self):
+        """Returns the shared S3 client, opening it on first use."""
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    exit_stack = AsyncExitStack()
+                    self._client = await exit_stack.enter_async_context(
+                        self.session.client(
+                            's3',
+                            endpoint_url=self.endpoint_url,
+                            config=AioConfig(
+                                signature_version='s3v4',
+                                max_pool_connections=S3_MAX_POOL_CONNECTIONS
+                            )
+                        )
+                    )
+                    self._exit_stack = exit_stack
+        return self._client
+
+    async def close(self):
+        """Closes the underlying client and its connection pool."""
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+        self._client = None
+        self._exit_stack = None
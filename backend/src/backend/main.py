@@ -131,6 +131,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"ERROR:    Application startup: Database table creation failed: {e}", flush=True)
 
+    # --- Warm up the DB connection pool ---
+    try:
+        await postgres_db.warm_up_pool()
+        print("INFO:     Application startup: Database connection pool warmed up.", flush=True)
+    except Exception as e:
+        print(f"ERROR:    Application startup: Database pool warm-up failed: {e}", flush=True)
+
     # --- Initialize App Settings ---
     await init_app_settings(postgres_db)
 
@@ -163,6 +170,10 @@ async def lifespan(app: FastAPI):
 
     print("INFO:     Application shutdown: Closing Redis connection...", flush=True)
     await redis_client.close()
+    print("INFO:     Application shutdown: Closing LiteLLM HTTP client...", flush=True)
+    await container.litellm_service().close()
+    print("INFO:     Application shutdown: Closing S3 client...", flush=True)
+    await container.s3_client().close()
     print("INFO:     Application shutdown: Disposing database engine.", flush=True)
     await postgres_db.engine.dispose()
 
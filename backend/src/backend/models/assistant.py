@@ -40,6 +40,8 @@ class Assistant(Base):
             postgresql_using='gin',
             postgresql_ops={'metadata': 'jsonb_path_ops'}
         ),
+        # B-Tree index for the hot lookup path (AssistantRepository.get_by_graph_id)
+        Index('assistant_graph_id_idx', 'graph_id'),
     )
 
     def __repr__(self):
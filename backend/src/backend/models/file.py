@@ -8,7 +8,8 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Integer,
-    func
+    func,
+    Index
 )
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
@@ -56,5 +57,24 @@ class File(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        # GIN index on processing_result for JSON containment (@>) filters,
+        # e.g. processing_result @> '{"status": "completed"}', which in SQLAlchemy is
+        # File.processing_result.contains({"status": "completed"}).
+        # jsonb_path_ops only supports @> (no ?, ?|, ?& key-existence operators) but is
+        # smaller and faster than the default jsonb_ops. Arrow-equality filters such as
+        # File.processing_result['status'].astext == 'completed' can't use it and seq-scan.
+        # (Selecting a key with ->> is fine, the index only matters for WHERE clauses.)
+        Index(
+            'file_processing_result_idx',
+            'processing_result',
+            postgresql_using='gin',
+            postgresql_ops={'processing_result': 'jsonb_path_ops'}
+        ),
+        # Composite B-Tree backing the per-notebook file listings
+        # (WHERE user_id = ... AND notebook_id = ...)
+        Index('file_user_notebook_idx', 'user_id', 'notebook_id'),
+    )
+
     def __repr__(self):
         return f"<File(file_id={self.file_id}, filename='{self.filename}')>"
@@ -54,6 +54,15 @@ class Notebook(Base):
     # One-to-many relationship to tasks
     tasks = relationship("Task", back_populates="notebook", cascade="all, delete-orphan")
 
+    # Read-only collections for eager loading (see NotebookRepository.get_by_id_full).
+    # Deletes are left to the ON DELETE CASCADE foreign keys on chat/files.
+    chats = relationship("Chat", viewonly=True, order_by="Chat.created_at.desc()")
+    files = relationship("File", viewonly=True, order_by="File.created_at.desc()")
+
+    # Fetch server-generated values (created_at, and updated_at on UPDATE) through
+    # RETURNING on flush, so callers don't need a refresh() round trip to read them
+    __mapper_args__ = {"eager_defaults": True}
+
     def __repr__(self):
         """Provides a developer-friendly representation of the object."""
         return f"<Notebook(id={self.id}, title='{self.title}', emoji='{self.emoji}', bg_color='{self.bg_color}')>"
\ No newline at end of file
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.file import File, ProcessingStatus
 
@@ -45,6 +45,23 @@ class FileRepository:
         await self.session.flush()  # Send data to DB to get defaults/IDs
         return file_record
 
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Inserts several file records in a single Core INSERT statement (executemany
+        with insertmanyvalues) against the table itself, so neither ORM instances nor
+        the ORM bulk-insert path are involved; column defaults still apply.
+        Each row maps File column names to values (every row with the same keys).
+        Returns (id, created_at) per inserted row, in input order, via RETURNING:
+        no refresh or follow-up SELECT is needed for the generated values.
+        Does not commit the transaction.
+        """
+        if not rows:
+            return []
+        table = File.__table__
+        stmt = insert(table).returning(table.c.id, table.c.created_at, sort_by_parameter_order=True)
+        result = await self.session.execute(stmt, rows)
+        return result.all()
+
     async def list_by_user_id(self, user_id: str, notebook_id: Optional[str] = None) -> List[File]:
         """
         Retrieve all files for a specific user, optionally filtered by notebook,
@@ -59,6 +76,26 @@ class FileRepository:
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def list_content_rows_by_notebook(self, user_id: str, notebook_id: str) -> List[Row]:
+        """
+        Retrieve only the columns needed to build a notebook's text context,
+        ordered by most recent. Returns plain rows (no ORM instances), with the
+        audio transcription extracted from processing_result in SQL.
+        """
+        query = (
+            select(
+                File.filename,
+                File.content_type,
+                File.content,
+                File.unique_filename,
+                File.processing_result['transcription'].astext.label('transcription')
+            )
+            .where(File.user_id == user_id, File.notebook_id == notebook_id)
+            .order_by(File.created_at.desc())
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
     async def get_by_id_and_user(self, file_id: str, user_id: str) -> Optional[File]:
         """
         Retrieve a file by ID and user ID to verify ownership.
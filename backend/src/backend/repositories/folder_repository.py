@@ -1,5 +1,6 @@
+import uuid
 from typing import List, Optional
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.folder import Folder
 
@@ -18,6 +19,21 @@ class FolderRepository:
         await self.session.flush()
         return folder
 
+    async def insert_returning_id(self, user_id: str, notebook_id: uuid.UUID, name: str, parent_id: Optional[uuid.UUID] = None) -> uuid.UUID:
+        """
+        Inserts a folder with a Core INSERT ... RETURNING id, without an ORM instance,
+        for callers that only need the new folder's ID.
+        Does not commit the transaction.
+        """
+        stmt = insert(Folder.__table__).values(
+            user_id=user_id,
+            notebook_id=notebook_id,
+            name=name,
+            parent_id=parent_id
+        ).returning(Folder.__table__.c.id)
+        result = await self.session.execute(stmt)
+        return result.scalar_one()
+
     async def list_by_notebook(self, user_id: str, notebook_id: str) -> List[Folder]:
         query = select(Folder).where(
             Folder.user_id == user_id,
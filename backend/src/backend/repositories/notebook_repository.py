@@ -1,7 +1,7 @@
 # backend/repositories/notebook_repository.py
 
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select
+from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.notebook import Notebook
@@ -48,41 +48,82 @@ class NotebookRepository:
         """Updates a notebook record with the provided data."""
         notebook = await self.get_by_id(notebook_id)
         if notebook:
-            for key, value in update_data.items():
-                if hasattr(notebook, key) and value is not None:
-                    setattr(notebook, key, value)
-            await self.session.flush()
+            await self.apply_update(notebook, update_data)
         return notebook
 
+    async def apply_update(self, notebook: Notebook, update_data: Dict[str, Any]) -> bool:
+        """
+        Sets the fields of update_data that differ from the loaded notebook (None means
+        "leave unchanged") and flushes them.
+        Returns False, without issuing an UPDATE, when nothing actually changed.
+        """
+        changes = {
+            key: value for key, value in update_data.items()
+            if value is not None and hasattr(notebook, key) and getattr(notebook, key) != value
+        }
+        if not changes:
+            return False
+
+        for key, value in changes.items():
+            setattr(notebook, key, value)
+        await self.session.flush()
+        return True
+
     async def delete_by_id(self, notebook_id: str) -> bool:
-        """Deletes a notebook by its ID."""
-        notebook = await self.get_by_id(notebook_id)
-        if notebook:
-            await self.session.delete(notebook)
-            await self.session.flush()
-            return True
-        return False
+        """
+        Deletes a notebook by its ID with a single DELETE statement.
+        Child rows (tasks, files, chats, folders, models, ...) are removed by the
+        ON DELETE CASCADE foreign keys, not loaded and deleted by the ORM.
+        """
+        stmt = delete(Notebook).where(Notebook.id == notebook_id)
+        result = await self.session.execute(stmt)
+        return result.rowcount > 0
 
     async def get_by_id_with_threads(self, notebook_id: str) -> Optional[Notebook]:
-        """Retrieves a notebook with all its threads eagerly loaded."""
-        stmt = select(Notebook).options(selectinload(Notebook.threads)).where(Notebook.id == notebook_id)
+        """
+        Retrieves a notebook with its chats and their threads eagerly loaded.
+        Threads belong to a notebook through its chats.
+        """
+        stmt = (
+            select(Notebook)
+            .options(selectinload(Notebook.chats).selectinload(Chat.thread))
+            .where(Notebook.id == notebook_id)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_by_id_full(self, notebook_id: str) -> Optional[Notebook]:
+        """
+        Retrieves a notebook with its chats (and their threads) and files eagerly loaded,
+        one SELECT per relationship instead of one per accessor call.
+        Prefer the narrow getters when a view only needs one of the collections.
+        """
+        stmt = (
+            select(Notebook)
+            .options(
+                selectinload(Notebook.chats).selectinload(Chat.thread),
+                selectinload(Notebook.files)
+            )
+            .where(Notebook.id == notebook_id)
+        )
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
     async def list_threads_for_notebook(self, notebook_id: str) -> List[Thread]:
-        """Retrieves all threads for a specific notebook."""
-        stmt = select(Thread).where(Thread.notebook_id == notebook_id).order_by(Thread.created_at.desc())
+        """Retrieves all threads for a specific notebook (through its chats)."""
+        stmt = (
+            select(Thread)
+            .join(Chat, Chat.thread_id == Thread.thread_id)
+            .where(Chat.notebook_id == notebook_id)
+            .distinct()
+            .order_by(Thread.created_at.desc())
+        )
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
     async def list_chats_for_notebook(self, notebook_id: str) -> List[Chat]:
-        """Retrieves all chats for a specific notebook (through threads)."""
-        stmt = (
-            select(Chat)
-            .join(Thread, Chat.thread_id == Thread.thread_id)
-            .where(Thread.notebook_id == notebook_id)
-            .order_by(Chat.created_at.desc())
-        )
+        """Retrieves all chats for a specific notebook."""
+        stmt = select(Chat).where(Chat.notebook_id == notebook_id).order_by(Chat.created_at.desc())
         result = await self.session.execute(stmt)
         return result.scalars().all()
 
@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
-from sqlalchemy import select, delete, and_, func, or_
+from sqlalchemy import select, delete, insert, and_, func, or_, Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from backend.models.task import Task, TaskStatus, TaskPriority
@@ -46,6 +46,23 @@ class TaskRepository:
         await self.session.flush()  # Send data to DB to get defaults/IDs
         return task_record
 
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Inserts several tasks in a single Core INSERT statement (executemany
+        with insertmanyvalues) against the table itself, so neither ORM instances nor
+        the ORM bulk-insert path are involved; column defaults still apply.
+        Each row maps Task column names to values (every row with the same keys).
+        Returns (id, created_at) per inserted row, in input order, via RETURNING:
+        no refresh or follow-up SELECT is needed for the generated values.
+        Does not commit the transaction.
+        """
+        if not rows:
+            return []
+        table = Task.__table__
+        stmt = insert(table).returning(table.c.id, table.c.created_at, sort_by_parameter_order=True)
+        result = await self.session.execute(stmt, rows)
+        return result.all()
+
     async def list_by_user_id(
         self,
         user_id: str,
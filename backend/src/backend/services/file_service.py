@@ -2,16 +2,17 @@
 
 import os
 import uuid
+import struct
 import time
 import asyncio
 import shutil
 import tempfile
-import subprocess
 import zipfile
-from io import BytesIO
-from typing import List, Optional, Dict, Any, BinaryIO, Tuple
+from typing import List, Optional, Dict, Any, BinaryIO, Tuple, Set, AsyncIterator
 
+from boto3.s3.transfer import TransferConfig
 from dotenv import load_dotenv
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.file import File, ProcessingStatus
@@ -23,6 +24,57 @@ load_dotenv()
 # Configuration
 S3_ENDPOINT = os.getenv("S3_ENDPOINT_URL", "http://seaweedfs:8333")
 BUCKET_NAME = os.getenv("BUCKET_NAME", "my-local-bucket")
+# Upper bound on parallel S3 downloads for bulk operations (e.g. notebook export)
+S3_MAX_CONCURRENT_DOWNLOADS = 16
+# Chunk size when streaming S3 objects through the service (e.g. into ZIP exports)
+S3_STREAM_CHUNK_SIZE = 1 << 20
+
+# Content types that are already compressed (or gain too little from DEFLATE to
+# justify the CPU), stored as-is in ZIP exports
+ZIP_STORED_CONTENT_TYPE_PREFIXES = ("audio/", "video/", "image/jpeg", "image/png", "image/webp", "image/gif")
+
+# Multipart settings for uploads: objects above the threshold are split into
+# 8MB parts which are uploaded concurrently, so a network error only retries one part.
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+)
+
+# Containers that may keep their index (moov atom) at the end of the file.
+# ffmpeg can't read those from a pipe, so they are staged to a temp file first.
+SEEK_REQUIRED_AUDIO_EXTENSIONS = {".mp4", ".m4a", ".mov", ".3gp"}
+FFMPEG_PIPE_CHUNK_SIZE = 64 * 1024
+# Converted WAV output is spooled in memory up to this size, then to a temp file on disk
+WAV_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+# Staged inputs go to a RAM-backed dir (tmpfs) when it has room, keeping disk seeks off the upload path
+FFMPEG_TMPDIR = os.getenv("FFMPEG_TMPDIR", "/dev/shm")
+
+
+class AudioConversionError(RuntimeError):
+    """ffmpeg could not convert an upload to WAV."""
+
+
+class _ZipStreamSink:
+    """
+    Write-only file object for zipfile.ZipFile. It is not seekable, so ZipFile
+    falls back to data descriptors and the archive can be drained as it is built.
+    """
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        """Returns and forgets everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
 
 
 class FileService:
@@ -30,6 +82,12 @@ class FileService:
     Service for handling file-related business logic, including S3 storage orchestration.
     """
 
+    # Buckets already verified/created by this process, shared across service instances
+    _bucket_ready: Set[str] = set()
+    _bucket_lock = asyncio.Lock()
+    # Characters that are invalid in file/folder names, mapped to '_'
+    _SANITIZE_TABLE = str.maketrans({c: '_' for c in '<>:"/\\|?*'})
+
     def __init__(self, session: AsyncSession, file_repository: FileRepository, s3_client=None, folder_repository=None):
         self.session = session
         self.repo = file_repository
@@ -45,83 +103,197 @@ class FileService:
             return "0 B"
 
         size_names = ["B", "KB", "MB", "GB", "TB"]
-        size_index = 0
-        size = float(size_bytes)
-
-        while size >= 1024 and size_index < len(size_names) - 1:
-            size /= 1024
-            size_index += 1
+        # Each unit is 2^10 of the previous one, so the unit index follows from the bit length
+        size_index = min((size_bytes.bit_length() - 1) // 10, len(size_names) - 1)
+        size = size_bytes / (1 << (size_index * 10))
 
         formatted_size = f"{size:.1f}".rstrip('0').rstrip('.')
         return f"{formatted_size} {size_names[size_index]}"
 
-    def generate_unique_filename(self, original_filename: str) -> str:
-        """Generate a unique filename for storage."""
-        extension = ""
-        if '.' in original_filename:
-            extension = original_filename.rsplit('.', 1)[1].lower()
+    @staticmethod
+    def generate_unique_filename(original_filename: str) -> str:
+        """
+        Generate a unique filename for storage.
+        Uniqueness comes from the random uuid4 part, so no DB lookup is needed.
+        """
+        extension = os.path.splitext(original_filename)[1][1:].lower()
 
-        unique_id = f"{int(time.time())}_{uuid.uuid4().hex}"
+        unique_id = f"{time.time_ns()}_{uuid.uuid4().hex}"
         return f"{unique_id}.{extension}" if extension else unique_id
 
-    async def convert_to_wav(self, file_obj: BinaryIO, original_filename: str) -> Tuple[str, str, str]:
+    async def convert_to_wav(self, file_obj: BinaryIO, original_filename: str) -> Tuple[BinaryIO, str, str]:
         """
         Converts input audio stream to a standard WAV format (16kHz, Mono, PCM).
-        Returns: (path_to_converted_file, new_filename, content_type)
+        The input is piped into ffmpeg (no copy on disk for most formats) and its output
+        is spooled, so the WAV header sizes can be filled in once the length is known.
+        If the conversion fails, the original stream is returned as a fallback.
+        Returns: (stream_to_upload, new_filename, content_type)
+        The caller must close the returned stream when it isn't file_obj.
         """
-        # Create a temporary directory for processing
-        temp_dir = tempfile.mkdtemp()
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+
+        original_ext = os.path.splitext(original_filename)[1].lower()
+        output_filename = os.path.splitext(original_filename)[0] + ".wav"
 
+        temp_dir = None
         try:
-            # 1. Save original stream to disk
-            original_ext = os.path.splitext(original_filename)[1] or ".tmp"
-            input_path = os.path.join(temp_dir, f"input{original_ext}")
-
-            with open(input_path, "wb") as f:
-                # Reset file pointer if needed (UploadFile.file is usually a SpooledTemporaryFile)
-                if hasattr(file_obj, 'seek'):
-                    file_obj.seek(0)
-                shutil.copyfileobj(file_obj, f)
-
-            # 2. Define output path
-            output_filename = os.path.splitext(original_filename)[0] + ".wav"
-            output_path = os.path.join(temp_dir, output_filename)
-
-            # 3. Run FFmpeg conversion
-            # -y: overwrite output files
-            # -i: input file url
-            # -ar 16000: set audio sampling rate to 16kHz (Ideal for Whisper)
-            # -ac 1: set number of audio channels to 1 (Mono)
-            # -c:a pcm_s16le: set audio codec to PCM signed 16-bit little-endian
-            command = [
-                "ffmpeg", "-y", "-i", input_path,
-                "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le",
-                output_path
-            ]
-
-            # Run in executor to avoid blocking async event loop
-            loop = asyncio.get_running_loop()
-            try:
-                await loop.run_in_executor(
-                    None,
-                    lambda: subprocess.run(
-                        command,
-                        stdout=subprocess.DEVNULL,
-                        stderr=subprocess.PIPE,
-                        check=True
-                    )
-                )
-                print(f"   > Converted audio to WAV: {output_path}")
-                return output_path, output_filename, "audio/wav"
-            except subprocess.CalledProcessError as e:
-                print(f"   > FFmpeg conversion failed: {e}")
-                # If conversion fails, return the input path as a fallback
-                return input_path, original_filename, "application/octet-stream"
+            if original_ext in SEEK_REQUIRED_AUDIO_EXTENSIONS:
+                # These containers can't be demuxed from a pipe, stage the input to a file
+                temp_dir, input_arg = self._stage_ffmpeg_input(file_obj, original_ext)
+            else:
+                input_arg = "pipe:0"
+
+            output = await self._run_ffmpeg_to_wav(file_obj, input_arg)
+            print(f"   > Converted audio to WAV: {output_filename}")
+            return output, output_filename, "audio/wav"
 
         except Exception as e:
             print(f"   > Error in audio conversion: {e}")
-            # Ensure cleanup happens later by caller or OS, but return input as fallback
-            return input_path if 'input_path' in locals() else "", original_filename, "application/octet-stream"
+            # If conversion fails, upload the original stream as a fallback
+            if hasattr(file_obj, 'seek'):
+                file_obj.seek(0)
+            return file_obj, original_filename, "application/octet-stream"
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _stage_ffmpeg_input(file_obj: BinaryIO, extension: str) -> Tuple[str, str]:
+        """
+        Copies the upload to a temp dir and returns (temp_dir, input_path).
+        FFMPEG_TMPDIR (tmpfs) is used when it has room for the upload; it is small
+        (e.g. a 256MB /dev/shm for 100MB uploads), so if it lacks the space, or fills
+        up mid-copy (ENOSPC), the input is staged in the regular on-disk temp dir.
+        """
+        start = file_obj.tell()
+        upload_size = file_obj.seek(0, os.SEEK_END) - start
+        file_obj.seek(start)
+
+        staging_dirs = [None]
+        if os.path.isdir(FFMPEG_TMPDIR):
+            try:
+                if shutil.disk_usage(FFMPEG_TMPDIR).free > upload_size:
+                    staging_dirs.insert(0, FFMPEG_TMPDIR)
+            except OSError:
+                pass
+
+        for staging_dir in staging_dirs:
+            temp_dir = tempfile.mkdtemp(dir=staging_dir)
+            input_path = os.path.join(temp_dir, f"input{extension}")
+            try:
+                with open(input_path, "wb") as f:
+                    shutil.copyfileobj(file_obj, f)
+                return temp_dir, input_path
+            except OSError as e:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                if staging_dir is None:
+                    raise
+                print(f"   > Could not stage audio in {staging_dir} ({e}), falling back to disk")
+                file_obj.seek(start)
+
+    async def _run_ffmpeg_to_wav(self, file_obj: BinaryIO, input_arg: str) -> BinaryIO:
+        """
+        Runs ffmpeg on input_arg (a staged file, or pipe:0 fed from file_obj) and returns
+        its WAV output, spooled and with correct RIFF/data sizes, rewound to the start.
+        Raises AudioConversionError if ffmpeg exits with an error.
+        """
+        # -y: overwrite output files
+        # -i: input file url (pipe:0 = stdin)
+        # -ar 16000: set audio sampling rate to 16kHz (Ideal for Whisper)
+        # -ac 1: set number of audio channels to 1 (Mono)
+        # -c:a pcm_s16le: set audio codec to PCM signed 16-bit little-endian
+        # -f wav pipe:1: write WAV to stdout
+        command = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", input_arg,
+            "-ar", "16000", "-ac", "1", "-c:a", "pcm_s16le",
+            "-f", "wav", "pipe:1"
+        ]
+        from_stdin = input_arg == "pipe:0"
+
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE if from_stdin else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        # Feed stdin and drain stderr concurrently so ffmpeg never blocks on a full pipe
+        stdin_task = asyncio.create_task(self._feed_ffmpeg_stdin(process, file_obj)) if from_stdin else None
+        stderr_task = asyncio.create_task(process.stderr.read())
+
+        output = tempfile.SpooledTemporaryFile(max_size=WAV_SPOOL_MAX_MEMORY)
+        try:
+            while True:
+                chunk = await process.stdout.read(FFMPEG_PIPE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                output.write(chunk)
+
+            if stdin_task:
+                await stdin_task
+            stderr = await stderr_task
+            return_code = await process.wait()
+            if return_code != 0:
+                message = stderr.decode('utf-8', errors='replace').strip()
+                print(f"   > FFmpeg conversion failed: {message}")
+                raise AudioConversionError(f"FFmpeg conversion failed with exit code {return_code}")
+
+            self._fix_wav_header(output)
+            output.seek(0)
+            return output
+        except BaseException:
+            output.close()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            for task in (stdin_task, stderr_task):
+                if task and not task.done():
+                    task.cancel()
+            raise
+
+    @staticmethod
+    def _fix_wav_header(wav_file: BinaryIO) -> None:
+        """
+        Fills in the RIFF and data chunk sizes of a WAV written to a pipe.
+        ffmpeg can't seek back on non-seekable output, so it leaves 0xFFFFFFFF
+        placeholders there; strict readers would take those as the real length.
+        """
+        total_size = wav_file.seek(0, os.SEEK_END)
+        wav_file.seek(0)
+        header = wav_file.read(min(total_size, 4096))
+        if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            raise AudioConversionError("FFmpeg output is not a WAV stream")
+
+        # Walk the chunks up to 'data' (fmt and any LIST metadata have real sizes)
+        offset = 12
+        while offset + 8 <= len(header):
+            chunk_id = header[offset:offset + 4]
+            if chunk_id == b"data":
+                data_size = total_size - (offset + 8)
+                wav_file.seek(4)
+                wav_file.write(struct.pack("<I", min(total_size - 8, 0xFFFFFFFF)))
+                wav_file.seek(offset + 4)
+                wav_file.write(struct.pack("<I", min(data_size, 0xFFFFFFFF)))
+                return
+            chunk_size = struct.unpack("<I", header[offset + 4:offset + 8])[0]
+            offset += 8 + chunk_size + (chunk_size & 1)
+        raise AudioConversionError("FFmpeg output has no data chunk")
+
+    @staticmethod
+    async def _feed_ffmpeg_stdin(process: asyncio.subprocess.Process, file_obj: BinaryIO) -> None:
+        """Writes the uploaded stream into ffmpeg's stdin in chunks, honouring back-pressure."""
+        try:
+            while True:
+                chunk = file_obj.read(FFMPEG_PIPE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            # ffmpeg exited early, its return code reports the failure
+            pass
+        finally:
+            process.stdin.close()
 
     async def upload_to_s3(self, file_obj: BinaryIO, object_name: str, content_type: str) -> str:
         """
@@ -131,37 +303,51 @@ class FileService:
         if not self.s3_client:
             raise ValueError("S3 Client not configured")
 
-        def _upload_sync():
-            # 1. Ensure bucket exists (idempotent-ish)
-            try:
-                self.s3_client.head_bucket(Bucket=BUCKET_NAME)
-            except Exception:
-                try:
-                    self.s3_client.create_bucket(Bucket=BUCKET_NAME)
-                except Exception as e:
-                    print(f"Error creating bucket (might already exist): {e}")
+        s3 = await self.s3_client.get_client()
 
-            # 2. Upload file
-            # Note: upload_fileobj automatically handles multipart uploads for large files
-            if hasattr(file_obj, 'seek'):
-                file_obj.seek(0)
+        # 1. Ensure bucket exists (checked once per process)
+        await self._ensure_bucket(s3)
 
-            self.s3_client.upload_fileobj(
-                file_obj,
-                BUCKET_NAME,
-                object_name,
-                ExtraArgs={'ContentType': content_type}
-            )
+        # 2. Upload file
+        # Note: upload_fileobj switches to a parallel multipart upload for large files
+        if hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
 
-        # Run synchronous boto3 code in a separate thread to not block the async event loop
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, _upload_sync)
+        await s3.upload_fileobj(
+            file_obj,
+            BUCKET_NAME,
+            object_name,
+            ExtraArgs={'ContentType': content_type},
+            Config=S3_TRANSFER_CONFIG
+        )
 
         # Construct the URL (Internal Docker URL)
         # We store this URL so the AI agent (running in Docker) can reach it.
         file_url = f"{S3_ENDPOINT}/{BUCKET_NAME}/{object_name}"
         return file_url
 
+    async def _ensure_bucket(self, s3) -> None:
+        """
+        Makes sure BUCKET_NAME exists. The result is cached for the process lifetime,
+        so only the first upload pays the head_bucket (and create_bucket) round trip.
+        """
+        if BUCKET_NAME in FileService._bucket_ready:
+            return
+
+        async with FileService._bucket_lock:
+            if BUCKET_NAME in FileService._bucket_ready:
+                return
+            try:
+                await s3.head_bucket(Bucket=BUCKET_NAME)
+            except Exception:
+                try:
+                    await s3.create_bucket(Bucket=BUCKET_NAME)
+                except Exception as e:
+                    # Not cached, so the next upload checks again
+                    print(f"Error creating bucket (might already exist): {e}")
+                    return
+            FileService._bucket_ready.add(BUCKET_NAME)
+
     async def get_file_stream_from_s3(self, unique_filename: str):
         """
         Returns a stream (Body) of the file from S3.
@@ -170,32 +356,45 @@ class FileService:
         if not self.s3_client:
             raise ValueError("S3 Client not configured")
 
-        def _get_sync():
-            return self.s3_client.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
-
-        loop = asyncio.get_running_loop()
-        response = await loop.run_in_executor(None, _get_sync)
+        s3 = await self.s3_client.get_client()
+        response = await s3.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
         return response['Body']
 
     async def get_file_bytes_from_s3(self, unique_filename: str) -> bytes:
         """
         Downloads a file from S3 and returns it as bytes.
-        Safe for use in loops as it runs IO in executor.
+        Safe for use in loops as the IO is fully asynchronous.
         """
         if not self.s3_client:
             return b""
 
-        def _read_sync():
-            try:
-                obj = self.s3_client.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
-                return obj['Body'].read()
-            except Exception as e:
-                # Log error but don't crash, return empty bytes so export can continue
-                print(f"Error reading bytes from S3 ({unique_filename}): {e}")
-                return b""
+        try:
+            s3 = await self.s3_client.get_client()
+            obj = await s3.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
+            async with obj['Body'] as body:
+                return await body.read()
+        except Exception as e:
+            # Log error but don't crash, return empty bytes so export can continue
+            print(f"Error reading bytes from S3 ({unique_filename}): {e}")
+            return b""
 
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, _read_sync)
+    async def iter_file_stream_from_s3(self, unique_filename: str, chunk_size: int = S3_STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Downloads a file from S3 as an async iterator of chunks, so consumers such as
+        the ZIP export only hold one chunk per file in memory.
+        Like get_file_bytes_from_s3, errors are logged and end the stream instead of raising.
+        """
+        if not self.s3_client:
+            return
+
+        try:
+            s3 = await self.s3_client.get_client()
+            obj = await s3.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
+            async with obj['Body'] as body:
+                async for chunk in body.iter_chunks(chunk_size):
+                    yield chunk
+        except Exception as e:
+            print(f"Error streaming bytes from S3 ({unique_filename}): {e}")
 
     async def get_text_content_from_s3(self, unique_filename: str) -> str:
         """
@@ -204,16 +403,14 @@ class FileService:
         if not self.s3_client:
             return ""
 
-        def _read_sync():
-            try:
-                obj = self.s3_client.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
-                return obj['Body'].read().decode('utf-8')
-            except Exception as e:
-                print(f"Error reading text from S3 ({unique_filename}): {e}")
-                return ""
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, _read_sync)
+        try:
+            s3 = await self.s3_client.get_client()
+            obj = await s3.get_object(Bucket=BUCKET_NAME, Key=unique_filename)
+            async with obj['Body'] as body:
+                return (await body.read()).decode('utf-8')
+        except Exception as e:
+            print(f"Error reading text from S3 ({unique_filename}): {e}")
+            return ""
 
     async def create_file_record(
             self,
@@ -245,6 +442,16 @@ class FileService:
         await self.session.refresh(file_record)
         return file_record
 
+    async def create_file_records_bulk(self, records: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Create several file records with a single INSERT.
+        Each record takes the same keys as create_file_record's arguments.
+        Returns the (id, created_at) rows from RETURNING, in record order, rather
+        than refreshed ORM instances.
+        Does not commit: the caller owns the transaction.
+        """
+        return await self.repo.create_many(records)
+
     async def get_files_for_user(self, user_id: str, notebook_id: Optional[str] = None) -> List[File]:
         """Retrieve all files for a user."""
         return await self.repo.list_by_user_id(user_id=user_id, notebook_id=notebook_id)
@@ -281,11 +488,8 @@ class FileService:
         # 1. Delete from S3 (Best effort)
         if self.s3_client and file_record.unique_filename:
             try:
-                loop = asyncio.get_running_loop()
-                await loop.run_in_executor(
-                    None,
-                    lambda: self.s3_client.delete_object(Bucket=BUCKET_NAME, Key=file_record.unique_filename)
-                )
+                s3 = await self.s3_client.get_client()
+                await s3.delete_object(Bucket=BUCKET_NAME, Key=file_record.unique_filename)
             except Exception as e:
                 print(f"Warning: Failed to delete S3 object {file_record.unique_filename}: {e}")
 
@@ -298,128 +502,207 @@ class FileService:
     async def get_notebook_files_content(self, user_id: str, notebook_id: str) -> str:
         """
         Retrieve and concatenate all file contents for a given notebook.
-        Fetches text directly from S3, or transcriptions from the DB.
+        Text comes from the DB content column when present (falling back to S3),
+        transcriptions from the DB.
         """
-        files = await self.repo.list_by_user_id(user_id=user_id, notebook_id=notebook_id)
-        if not files:
+        rows = await self.repo.list_content_rows_by_notebook(user_id=user_id, notebook_id=notebook_id)
+        if not rows:
             return ""
 
-        content_parts = []
-        for file in files:
-            try:
-                # Text files: fetch content from S3
-                if file.content_type and file.content_type.startswith('text/'):
-                    text_content = await self.get_text_content_from_s3(file.unique_filename)
-                    if text_content:
-                        content_parts.append(f"--- File: {file.filename} ---\n{text_content}")
-
-                # Audio files: use stored transcription
-                elif file.content_type and file.content_type.startswith('audio/'):
-                    if file.processing_result and isinstance(file.processing_result, dict):
-                        transcription = file.processing_result.get('transcription')
-                        if transcription:
-                            content_parts.append(f"--- File: {file.filename} (Transcription) ---\n{transcription}")
-
-            except Exception as e:
-                print(f"Error processing file {file.filename} for notebook context: {str(e)}")
-                continue
+        # Slots are filled in file order: DB-backed parts directly, S3-backed
+        # text parts once their (concurrent) downloads complete
+        content_parts: List[Optional[str]] = []
+        s3_fetches = []
+        for row in rows:
+            # Text files: DB content first, S3 only if it is empty
+            if row.content_type and row.content_type.startswith('text/'):
+                if row.content:
+                    content_parts.append(f"--- File: {row.filename} ---\n{row.content}")
+                elif row.unique_filename:
+                    s3_fetches.append((len(content_parts), row))
+                    content_parts.append(None)
+
+            # Audio files: use stored transcription
+            elif row.content_type and row.content_type.startswith('audio/'):
+                if row.transcription:
+                    content_parts.append(f"--- File: {row.filename} (Transcription) ---\n{row.transcription}")
+
+        if s3_fetches:
+            semaphore = asyncio.Semaphore(S3_MAX_CONCURRENT_DOWNLOADS)
+
+            async def _fetch_text(unique_filename: str) -> str:
+                async with semaphore:
+                    return await self.get_text_content_from_s3(unique_filename)
+
+            texts = await asyncio.gather(
+                *(_fetch_text(row.unique_filename) for _, row in s3_fetches),
+                return_exceptions=True
+            )
+            for (slot, row), text_content in zip(s3_fetches, texts):
+                if isinstance(text_content, BaseException):
+                    print(f"Error processing file {row.filename} for notebook context: {str(text_content)}")
+                elif text_content:
+                    content_parts[slot] = f"--- File: {row.filename} ---\n{text_content}"
 
-        return "\n\n".join(content_parts)
+        return "\n\n".join(part for part in content_parts if part)
 
-    async def export_notebook_as_zip(self, user_id: str, notebook_id: str, notebook_name: str) -> BytesIO:
+    async def export_notebook_as_zip(self, user_id: str, notebook_id: str, notebook_name: str) -> AsyncIterator[bytes]:
         """
         Export all files in a notebook as a ZIP file, maintaining folder structure.
-        Returns a BytesIO object containing the ZIP file.
+        Returns an async iterator yielding the archive bytes as each entry is written,
+        so the whole ZIP never has to sit in memory.
         """
-        # Fetch all files and folders for the notebook
+        # Fetch all files and folders for the notebook up front: the request's DB
+        # session is closed before a StreamingResponse starts consuming the iterator
         files = await self.repo.list_by_user_id(user_id=user_id, notebook_id=notebook_id)
 
-        # Create a BytesIO buffer for the ZIP
-        zip_buffer = BytesIO()
+        folders = []
+        if self.folder_repo:
+            folders = await self.folder_repo.list_by_notebook(user_id=user_id, notebook_id=notebook_id)
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Create a folder with the notebook name
-            safe_notebook_name = self._sanitize_filename(notebook_name or "notebook")
-            base_folder = f"{safe_notebook_name}/"
+        return self._stream_notebook_zip(files, folders, notebook_name)
 
-            # Fetch all folders to build folder structure
-            folders = []
-            if self.folder_repo:
-                folders = await self.folder_repo.list_by_notebook(user_id=user_id, notebook_id=notebook_id)
+    async def _stream_notebook_zip(self, files: List[File], folders: List[Any], notebook_name: str) -> AsyncIterator[bytes]:
+        folders_by_id = {str(f.id): f for f in folders}
+        path_cache: Dict[str, str] = {}
 
-            # Create folder structure in ZIP
-            for folder in folders:
-                folder_path = self._get_folder_path(folder, folders)
-                zip_path = f"{base_folder}{folder_path}/"
-                zipf.writestr(zip_path, "")  # Create empty directory entry
+        # Single classification pass: DB content is the source of truth for text/template
+        # files, so S3 is only hit when it is empty and a backing object (unique_filename) exists
+        db_items: List[Tuple[File, bytes]] = []
+        s3_files: List[File] = []
+        for file in files:
+            if file.content:
+                content = file.content.encode('utf-8') if isinstance(file.content, str) else file.content
+                db_items.append((file, content))
+            elif file.unique_filename:
+                s3_files.append(file)
+            else:
+                db_items.append((file, b""))
+
+        # Downloads run ahead of the writer in a sliding window: a slot is taken before
+        # requesting an object and only given back once that file has been written to the
+        # archive. Each prefetch only pulls the first chunk, the rest of the body is copied
+        # into the archive as it arrives, so memory stays at one chunk per open download.
+        window = asyncio.Semaphore(S3_MAX_CONCURRENT_DOWNLOADS)
+
+        async def _prefetch(stream: AsyncIterator[bytes]) -> bytes:
+            await window.acquire()
+            # Never raises: failures are logged and end the stream (empty entry)
+            async for chunk in stream:
+                return chunk
+            return b""
 
-            # Add files to ZIP
-            for file in files:
-                try:
-                    file_content = b""
-
-                    # 1. Try DB content first (Source of truth for text/template files)
-                    if file.content:
-                        if isinstance(file.content, str):
-                            file_content = file.content.encode('utf-8')
-                        else:
-                            file_content = file.content
-
-                    # 2. If DB content is empty, try S3 (Images, Audio, or legacy text)
-                    # Only try if we have a unique_filename, which implies a backing file
-                    elif file.unique_filename:
-                        try:
-                            file_content = await self.get_file_bytes_from_s3(file.unique_filename)
-                        except Exception as s3_err:
-                            print(f"S3 fetch failed for {file.filename}: {s3_err}")
-                            # Fallback to empty if S3 fails
-                            file_content = b""
+        s3_streams = []
+        for file in s3_files:
+            stream = self.iter_file_stream_from_s3(file.unique_filename)
+            s3_streams.append((file, stream, asyncio.create_task(_prefetch(stream))))
 
+        sink = _ZipStreamSink()
+        try:
+            # ZipFile is not safe for concurrent writes, entries are written in order.
+            # Compression is chosen per entry, so the archive default is ZIP_STORED
+            with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as zipf:
+                # Create a folder with the notebook name
+                safe_notebook_name = self._sanitize_filename(notebook_name or "notebook")
+                base_folder = f"{safe_notebook_name}/"
+
+                def _entry_info(file: File) -> zipfile.ZipInfo:
                     # Determine the path within the ZIP
-                    if file.folder_id:
-                        # Find the folder safely using string comparison for UUIDs
-                        folder = next((f for f in folders if str(f.id) == str(file.folder_id)), None)
-                        if folder:
-                            folder_path = self._get_folder_path(folder, folders)
-                            zip_path = f"{base_folder}{folder_path}/{file.filename}"
-                        else:
-                            # Folder not found, put in root
-                            zip_path = f"{base_folder}{file.filename}"
+                    folder = folders_by_id.get(str(file.folder_id)) if file.folder_id else None
+                    if folder:
+                        folder_path = self._get_folder_path(folder, folders_by_id, path_cache)
+                        zip_path = f"{base_folder}{folder_path}/{file.filename}"
                     else:
-                        # No folder, put in root
+                        # No folder (or folder not found), put in root
                         zip_path = f"{base_folder}{file.filename}"
 
-                    # Add file to ZIP
-                    zipf.writestr(zip_path, file_content)
+                    zinfo = zipfile.ZipInfo(zip_path, date_time=time.localtime()[:6])
+                    zinfo.compress_type = self._zip_compress_type(file.content_type)
+                    return zinfo
+
+                # Create folder structure in ZIP
+                for folder in folders:
+                    folder_path = self._get_folder_path(folder, folders_by_id, path_cache)
+                    zip_path = f"{base_folder}{folder_path}/"
+                    zipf.writestr(zip_path, "")  # Create empty directory entry
+                yield sink.drain()
+
+                # DB-served files first, while the S3 window fills up
+                for file, file_content in db_items:
+                    try:
+                        zipf.writestr(_entry_info(file), file_content)
+                    except Exception as e:
+                        print(f"Error adding file {file.filename} to ZIP: {e}")
+                    yield sink.drain()
+
+                # Then S3-served files (Images, Audio, or legacy text), streamed chunk by chunk.
+                # Sizes aren't known up front, so entries may need ZIP64 sizes.
+                for file, stream, task in s3_streams:
+                    try:
+                        first_chunk = await task
+                        with zipf.open(_entry_info(file), 'w', force_zip64=True) as entry:
+                            entry.write(first_chunk)
+                            yield sink.drain()
+                            async for chunk in stream:
+                                entry.write(chunk)
+                                yield sink.drain()
+                    except Exception as e:
+                        print(f"Error adding file {file.filename} to ZIP: {e}")
+                    finally:
+                        window.release()
+                        await stream.aclose()
+                    yield sink.drain()
+
+            # Central directory is written on close
+            yield sink.drain()
+        finally:
+            # Client went away mid-download: stop the fetches and release their connections
+            pending = [task for _, _, task in s3_streams if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            for _, stream, _ in s3_streams:
+                await stream.aclose()
 
-                except Exception as e:
-                    print(f"Error adding file {file.filename} to ZIP: {e}")
-                    continue
-
-        # Reset buffer position
-        zip_buffer.seek(0)
-        return zip_buffer
+    @staticmethod
+    def _zip_compress_type(content_type: Optional[str]) -> int:
+        """Skip DEFLATE for media payloads that are already compressed."""
+        if content_type and content_type.lower().startswith(ZIP_STORED_CONTENT_TYPE_PREFIXES):
+            return zipfile.ZIP_STORED
+        return zipfile.ZIP_DEFLATED
 
-    def _get_folder_path(self, folder: Any, all_folders: List[Any], path: str = "") -> str:
+    def _get_folder_path(self, folder: Any, folders_by_id: Dict[str, Any], path_cache: Dict[str, str]) -> str:
         """
-        Recursively build folder path by traversing parent folders.
+        Build the folder path by walking up the parent folders.
+        Paths are memoized in path_cache, so every folder is resolved at most once.
         """
-        current_path = folder.name if not path else f"{folder.name}/{path}"
-
-        # Find parent folder
-        if folder.parent_id:
-            parent = next((f for f in all_folders if str(f.id) == str(folder.parent_id)), None)
-            if parent:
-                return self._get_folder_path(parent, all_folders, current_path)
-
-        return current_path
+        names = []
+        visited = set()
+        current = folder
+        prefix = ""
+
+        while current is not None:
+            current_id = str(current.id)
+            if current_id in path_cache:
+                prefix = path_cache[current_id]
+                break
+            if current_id in visited:
+                # Guard against cycles in corrupted hierarchies
+                break
+            visited.add(current_id)
+            names.append((current_id, current.name))
+            current = folders_by_id.get(str(current.parent_id)) if current.parent_id else None
+
+        # Resolve from the top-most folder down, caching every intermediate path
+        for current_id, name in reversed(names):
+            prefix = f"{prefix}/{name}" if prefix else name
+            path_cache[current_id] = prefix
+
+        return prefix
 
     def _sanitize_filename(self, filename: str) -> str:
         """
         Sanitize filename for safe file system usage.
         """
-        # Remove or replace invalid characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        return filename.strip()
\ No newline at end of file
+        # Replace invalid characters in a single pass
+        return filename.translate(self._SANITIZE_TABLE).strip()
\ No newline at end of file
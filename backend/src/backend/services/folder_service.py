@@ -1,3 +1,4 @@
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.repositories.folder_repository import FolderRepository
 from backend.models.folder import Folder
@@ -15,6 +16,13 @@ class FolderService:
         await self.session.refresh(folder)
         return folder
 
+    async def create_folder_record(self, user_id: str, notebook_id: uuid.UUID, name: str, parent_id: Optional[uuid.UUID] = None) -> uuid.UUID:
+        """
+        Create a folder and return only its ID (no ORM instance).
+        Does not commit: the caller owns the transaction.
+        """
+        return await self.repo.insert_returning_id(user_id, notebook_id, name, parent_id)
+
     async def get_notebook_folders(self, user_id: str, notebook_id: str) -> List[Folder]:
         return await self.repo.list_by_notebook(user_id, notebook_id)
 
@@ -1,8 +1,12 @@
 # backend/src/backend/services/litellm_service.py
 
 import os
-import requests
-from typing import Optional, Dict, Any
+import asyncio
+from contextlib import asynccontextmanager
+import httpx
+import orjson
+from cachetools import TTLCache
+from typing import Optional, Dict, Any, AsyncIterator, List
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -27,6 +31,37 @@ SUBSCRIPTION_PLANS = {
     }
 }
 
+# Usage stats are polled by the frontend; serve repeated lookups for a key from memory
+USAGE_CACHE_MAXSIZE = 10_000
+USAGE_CACHE_TTL_SECONDS = 5
+
+
+class _KeyedLocks:
+    """
+    One asyncio.Lock per key, kept only while someone holds or waits for it, so the
+    map stays as small as the set of keys currently in use.
+    Like any asyncio.Lock this only serializes within one process and event loop.
+    """
+
+    def __init__(self):
+        # key -> [lock, number of holders + waiters]
+        self._locks: Dict[str, List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        entry = self._locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
 
 class LiteLLMService:
     """
@@ -44,14 +79,32 @@ class LiteLLMService:
         if not self.master_key:
             print("WARNING: LITELLM_MASTER_KEY is not set. LiteLLMService will fail.")
 
-    def _get_headers(self) -> Dict[str, str]:
-        """Helper to get authentication headers."""
-        return {
-            "Authorization": f"Bearer {self.master_key}",
-            "Content-Type": "application/json"
-        }
+        # Shared keep-alive client: calls reuse pooled connections instead of
+        # opening a new TCP connection per request. Bodies are encoded/decoded with
+        # orjson, hence the explicit Content-Type header.
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.master_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+
+        # Per-key locks serializing budget read-modify-write cycles (see top_up_user_budget)
+        self._budget_locks = _KeyedLocks()
+
+        # Short-lived usage stats per key (see get_user_usage); the per-key locks make
+        # concurrent misses for the same key share a single proxy call
+        self._usage_cache: TTLCache = TTLCache(maxsize=USAGE_CACHE_MAXSIZE, ttl=USAGE_CACHE_TTL_SECONDS)
+        self._usage_locks = _KeyedLocks()
 
-    def generate_key_for_user(self, user_id: str, plan_name: str = "free", email: str = None) -> Optional[str]:
+    async def close(self) -> None:
+        """Closes the underlying HTTP connection pool."""
+        await self._client.aclose()
+
+    async def generate_key_for_user(self, user_id: str, plan_name: str = "free", email: str = None) -> Optional[str]:
         """
         Generates a Virtual Key for a user based on a specific subscription plan.
         Returns the raw key string (e.g., 'sk-litellm-...') or None on failure.
@@ -59,8 +112,6 @@ class LiteLLMService:
         # 1. Get plan details (fallback to free if invalid plan name)
         plan = SUBSCRIPTION_PLANS.get(plan_name, SUBSCRIPTION_PLANS["free"])
 
-        url = f"{self.base_url}/key/generate"
-
         # 2. Construct Payload
         payload = {
             "user_id": str(user_id),
@@ -78,10 +129,10 @@ class LiteLLMService:
         # 3. Call LiteLLM API
         try:
             print(f"Generating LiteLLM key for user {user_id} ({plan_name})...")
-            response = requests.post(url, headers=self._get_headers(), json=payload)
+            response = await self._client.post("/key/generate", content=orjson.dumps(payload))
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
             # The 'key' field contains the actual string we need to save
             return data["key"]
         except Exception as e:
@@ -90,7 +141,7 @@ class LiteLLMService:
                 print(f"LiteLLM Response: {e.response.text}")
             return None
 
-    def upgrade_user_plan(self, existing_key: str, new_plan_name: str) -> bool:
+    async def upgrade_user_plan(self, existing_key: str, new_plan_name: str) -> bool:
         """
         Updates an existing key to match a new plan (e.g. Free -> Pro).
         This updates the max_budget and rate limits.
@@ -100,8 +151,6 @@ class LiteLLMService:
             print(f"Error: Plan '{new_plan_name}' does not exist.")
             return False
 
-        url = f"{self.base_url}/key/update"
-
         payload = {
             "key": existing_key,
             "max_budget": plan["max_budget"],
@@ -112,46 +161,48 @@ class LiteLLMService:
         }
 
         try:
-            response = requests.post(url, headers=self._get_headers(), json=payload)
+            response = await self._client.post("/key/update", content=orjson.dumps(payload))
             response.raise_for_status()
+            self._usage_cache.pop(existing_key, None)
             print(f"Successfully upgraded key to plan: {new_plan_name}")
             return True
         except Exception as e:
             print(f"Error upgrading user plan: {e}")
             return False
 
-    def top_up_user_budget(self, key: str, amount_to_add: float) -> Optional[float]:
+    async def top_up_user_budget(self, key: str, amount_to_add: float) -> Optional[float]:
         """
         Increases the max_budget for a specific key.
         Useful when a user buys a 'Top-Up' pack (e.g., $5 extra).
         Returns the NEW total budget limit.
+        The LiteLLM API has no atomic increment, so concurrent top-ups for the same key
+        are serialized to avoid losing one of the updates. That only holds within this
+        process: top-ups for one key handled by different workers can still race.
         """
-        info_url = f"{self.base_url}/key/info"
-        update_url = f"{self.base_url}/key/update"
-
         try:
-            # 1. Get current info to find the current limit
-            info_response = requests.get(
-                info_url,
-                headers=self._get_headers(),
-                params={"key": key}
-            )
-            info_response.raise_for_status()
-            key_info = info_response.json()
-
-            # Default to 0.0 if not set
-            current_max_budget = key_info.get("max_budget") or 0.0
-
-            # 2. Calculate new total
-            new_budget = current_max_budget + amount_to_add
-
-            # 3. Update the key
-            update_payload = {
-                "key": key,
-                "max_budget": new_budget
-            }
-
-            requests.post(update_url, headers=self._get_headers(), json=update_payload)
+            async with self._budget_locks.hold(key):
+                # 1. Get current info to find the current limit
+                # (The two calls stay sequential but share the same keep-alive connection)
+                info_response = await self._client.get("/key/info", params={"key": key})
+                info_response.raise_for_status()
+                key_info = orjson.loads(info_response.content)
+
+                # Default to 0.0 if not set
+                current_max_budget = key_info.get("max_budget") or 0.0
+
+                # 2. Calculate new total
+                new_budget = current_max_budget + amount_to_add
+
+                # 3. Update the key
+                update_payload = {
+                    "key": key,
+                    "max_budget": new_budget
+                }
+
+                update_response = await self._client.post("/key/update", content=orjson.dumps(update_payload))
+                update_response.raise_for_status()
+                self._usage_cache.pop(key, None)
+
             print(f"User budget increased from ${current_max_budget} to ${new_budget}")
             return new_budget
 
@@ -159,22 +210,36 @@ class LiteLLMService:
             print(f"Error topping up budget: {e}")
             return None
 
-    def get_user_usage(self, key: str) -> Dict[str, Any]:
+    async def get_user_usage(self, key: str) -> Dict[str, Any]:
         """
         Returns stats about the key: { "spend": 0.50, "max_budget": 1.00, "plan": "free" }
         Useful for showing a progress bar in the frontend.
+        Results are cached per key for USAGE_CACHE_TTL_SECONDS; plan changes and
+        top-ups invalidate the entry. Callers get their own copy of the cached stats.
         """
-        url = f"{self.base_url}/key/info"
-        try:
-            response = requests.get(url, headers=self._get_headers(), params={"key": key})
-            response.raise_for_status()
-            data = response.json()
-
-            return {
-                "spend": data.get("spend", 0.0),
-                "max_budget": data.get("max_budget", 0.0),
-                "plan": data.get("metadata", {}).get("plan", "unknown")
-            }
-        except Exception as e:
-            print(f"Error fetching usage: {e}")
-            return {}
\ No newline at end of file
+        cached = self._usage_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        async with self._usage_locks.hold(key):
+            # Another request may have filled the entry while we waited
+            cached = self._usage_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+            try:
+                response = await self._client.get("/key/info", params={"key": key})
+                response.raise_for_status()
+                data = orjson.loads(response.content)
+
+                usage = {
+                    "spend": data.get("spend", 0.0),
+                    "max_budget": data.get("max_budget", 0.0),
+                    "plan": data.get("metadata", {}).get("plan", "unknown")
+                }
+            except Exception as e:
+                print(f"Error fetching usage: {e}")
+                return {}
+
+            self._usage_cache[key] = usage
+            return dict(usage)
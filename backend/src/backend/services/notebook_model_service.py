@@ -79,6 +79,28 @@ class NotebookModelService:
 
         return notebook_model
 
+    async def ensure_notebook_models(self, user_id: str, notebook_id: str, model_types: List[str]) -> None:
+        """
+        Makes sure the notebook has a model of each given type, creating the missing ones
+        from the app settings defaults. Existing models are read with a single query and
+        all new ones are committed together.
+        """
+        existing = await self.repo.list_by_notebook_id(notebook_id)
+        existing_types = {notebook_model.model.type for notebook_model in existing if notebook_model.model}
+
+        missing_types = [model_type for model_type in model_types if model_type not in existing_types]
+        for model_type in missing_types:
+            value = await self.app_settings_service.get_value(key=f"{model_type}_model")
+            generative_model: GenerativeModel = await self.generative_model_service.get_model(value, model_type)
+            await self.repo.create(
+                user_id=user_id,
+                notebook_id=notebook_id,
+                generative_model_id=generative_model.id
+            )
+
+        if missing_types:
+            await self.session.commit()
+
     async def get_notebook_models_by_notebook_id(self, notebook_id: str) -> List[NotebookModel]:
         return await self.repo.list_by_notebook_id(notebook_id)
 
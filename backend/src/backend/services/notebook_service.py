@@ -1,3 +1,4 @@
+import logging
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.models.notebook import Notebook
@@ -8,6 +9,8 @@ from backend.repositories.notebook_repository import NotebookRepository
 from backend.repositories.thread_repository import ThreadRepository
 from backend.services.notebook_model_service import NotebookModelService
 
+logger = logging.getLogger(__name__)
+
 
 class NotebookService:
     """
@@ -36,58 +39,67 @@ class NotebookService:
 
     async def create_notebook(self, user_id: str, emoji: str, title: str,
                               date: str, bg_color: str = '#4d4dff', text_color: str = '#ffffff') -> Notebook:
-        """Creates a notebook and applies template, then commits the transaction."""
-        print(f"[TEMPLATE DEBUG] Starting create_notebook for user {user_id}")
-
-        # 1. Create notebook record
-        notebook = await self.repo.create(
-            user_id=user_id, emoji=emoji, title=title, date=date,
-            bg_color=bg_color, text_color=text_color)
-
-        print(f"[TEMPLATE DEBUG] Notebook created in session with ID: {notebook.id}")
-
-        # 2. Commit immediately to ensure Notebook ID exists in DB for Foreign Keys
-        await self.session.commit()
-        await self.session.refresh(notebook)
-        print("[TEMPLATE DEBUG] Notebook committed to DB.")
-
-        # 3. Apply template if available
-        if self.template_service:
-            print("[TEMPLATE DEBUG] Template Service found. Applying template...")
-            try:
-                await self.template_service.apply_content_creation_template(
-                    user_id=user_id,
-                    notebook_id=str(notebook.id)
-                )
-
-                # Commit the template items
-                await self.session.commit()
-                print("[TEMPLATE DEBUG] Template applied and committed successfully.")
-
-            except Exception as e:
-                # Log error aggressively
-                print(f"❌ [TEMPLATE DEBUG] ERROR: Template application failed: {e}")
-                import traceback
-                traceback.print_exc()
-        else:
-            print("[TEMPLATE DEBUG] WARNING: No Template Service injected!")
+        """
+        Creates a notebook and applies the template atomically: one commit on success,
+        a rollback of everything (notebook included) if any step fails.
+        """
+        logger.debug("Starting create_notebook for user %s", user_id)
+
+        # The request's session has already autobegun a transaction (e.g. for the
+        # current-user lookup), so session.begin() can't be used; this block gives the
+        # same commit-or-rollback guarantee on that transaction.
+        try:
+            # 1. Create notebook record (the repository flushes, so the row exists for
+            # the template's Foreign Keys and RETURNING has populated the server defaults)
+            notebook = await self.repo.create(
+                user_id=user_id, emoji=emoji, title=title, date=date,
+                bg_color=bg_color, text_color=text_color)
+
+            logger.debug("Notebook created in session with ID: %s", notebook.id)
+
+            # 2. Apply template if available, in the same transaction
+            if self.template_service:
+                logger.debug("Applying template to notebook %s", notebook.id)
+                try:
+                    await self.template_service.apply_content_creation_template(
+                        user_id=user_id,
+                        notebook_id=notebook.id
+                    )
+                    logger.debug("Template applied to notebook %s", notebook.id)
+
+                except Exception:
+                    logger.exception("Template application failed for user=%s notebook=%s", user_id, notebook.id)
+                    raise
+            else:
+                logger.warning("No template service injected, notebook %s created without template", notebook.id)
+
+            # 3. Single commit for the notebook and its template items
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
 
         return notebook
 
     async def set_notebook_models(self, user_id: str, notebook_id: str):
-        await self.notebook_model_service.get_notebook_model_by_id_and_type(
-            notebook_id=notebook_id, model_type="light", user_id=user_id
-        )
-        await self.notebook_model_service.get_notebook_model_by_id_and_type(
-            notebook_id=notebook_id, model_type="heavy", user_id=user_id
+        # One lookup for both types and a single commit for whatever is missing
+        await self.notebook_model_service.ensure_notebook_models(
+            user_id=user_id, notebook_id=notebook_id, model_types=["light", "heavy"]
         )
 
     async def update_notebook(self, notebook_id: str, update_data: Dict[str, Any]) -> Optional[Notebook]:
-        """Updates a notebook and commits the transaction."""
-        notebook = await self.repo.update(notebook_id, update_data)
-        if notebook:
+        """
+        Updates a notebook and commits the transaction.
+        Empty or unchanged updates (e.g. a PUT re-sending the current values) skip the
+        UPDATE and the commit.
+        """
+        if not any(value is not None for value in update_data.values()):
+            return await self.repo.get_by_id(notebook_id)
+
+        notebook = await self.repo.get_by_id(notebook_id)
+        if notebook and await self.repo.apply_update(notebook, update_data):
+            # updated_at already came back via RETURNING (eager_defaults), no refresh needed
             await self.session.commit()
-            await self.session.refresh(notebook)
         return notebook
 
     async def delete_notebook(self, notebook_id: str) -> bool:
@@ -108,7 +120,6 @@ class NotebookService:
             notebook_id=notebook_id
         )
         await self.session.commit()
-        await self.session.refresh(thread)
         return thread
 
     # --- Read methods are simple pass-throughs to the repository ---
@@ -125,6 +136,29 @@ class NotebookService:
     async def get_notebook_with_threads(self, notebook_id: str) -> Optional[Notebook]:
         return await self.repo.get_by_id_with_threads(notebook_id)
 
+    async def get_notebook_full(self, notebook_id: str) -> Optional[Notebook]:
+        """Notebook with chats (and their threads) and files loaded, for full notebook views."""
+        return await self.repo.get_by_id_full(notebook_id)
+
+    async def get_notebook_contents(self, notebook_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Notebook plus its threads, chats and files from a single eager-loaded fetch,
+        in place of calling the get_*_for_notebook getters one after another.
+        Returns None if the notebook doesn't exist.
+        """
+        notebook = await self.repo.get_by_id_full(notebook_id)
+        if not notebook:
+            return None
+
+        # Threads are reached through chats; several chats may share one thread
+        threads = {chat.thread.thread_id: chat.thread for chat in notebook.chats if chat.thread}
+        return {
+            "notebook": notebook,
+            "threads": sorted(threads.values(), key=lambda thread: thread.created_at, reverse=True),
+            "chats": notebook.chats,
+            "files": notebook.files,
+        }
+
     async def get_threads_for_notebook(self, notebook_id: str) -> List[Thread]:
         return await self.repo.list_threads_for_notebook(notebook_id)
 
@@ -1,4 +1,6 @@
-from typing import List, Dict, Any
+import logging
+import uuid
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import date, timedelta  # Changed: import date
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.services.file_service import FileService
@@ -6,6 +8,89 @@ from backend.services.folder_service import FolderService
 from backend.services.task_service import TaskService
 from backend.models.dtos.task_dtos import TaskCreateRequest, TaskStatusEnum, TaskPriorityEnum
 
+logger = logging.getLogger(__name__)
+
+# Static template content, built once at import
+_TEMPLATES: Dict[str, str] = {
+    "tasks.md": """# Task Planning\n\n## Project Goals\nDefine what you want to achieve with this project.\n\n## Checklist\n- [ ] Brainstorm ideas\n- [ ] Conduct research\n- [ ] Draft content\n- [ ] Review and refine\n\n## Notes\n- Deadline: TBD\n- Priority: High\n""",
+    "voiceover.md": """# Voiceover Script\n\n## Introduction (0:00 - 0:30)\n**Speaker:** "Hello and welcome to..."\n\n## Key Point 1 (0:30 - 2:00)\n**Speaker:** "The most important thing to remember is..."\n\n## Conclusion (2:00 - End)\n**Speaker:** "Thank you for watching."\n""",
+    "links.md": """# Resources\n\n## References\n- [Google](https://google.com)\n- [Research Paper](https://example.com)\n\n## Media Assets\n- [Images](https://unsplash.com)\n- [Icons](https://lucide.dev)\n"""
+}
+
+# Per-file columns that never vary, resolved once at import so each notebook only
+# adds its ids. Content stays str: files.content is a Text column and asyncpg's text
+# codec takes str (it encodes it itself), so pre-encoded bytes wouldn't bind.
+_TEMPLATE_FILE_COLUMNS: Dict[str, Dict[str, str]] = {
+    filename: {"filename": filename, "content": content, "content_type": "text/markdown"}
+    for filename, content in _TEMPLATES.items()
+}
+
+# Kanban tasks created with every notebook, as (days until due, task fields).
+# Only the due date depends on the day of creation.
+_TEMPLATE_TASK_DEFINITIONS: Tuple[Tuple[int, Dict[str, Any]], ...] = (
+    # --- TO DO COLUMN (3 Tasks) ---
+    (1, {  # Due tomorrow
+        "title": "Initial Brainstorming",
+        "description": "Come up with 5 solid ideas for the content. Focus on audience engagement.",
+        "status": TaskStatusEnum.TODO.value,
+        "priority": TaskPriorityEnum.HIGH.value,
+        "tags": ["planning", "creative"],
+        "position": 0
+    }),
+    (2, {  # Due in 2 days
+        "title": "Market Research",
+        "description": "Analyze competitors and gather reference links in Resources/links.md.",
+        "status": TaskStatusEnum.TODO.value,
+        "priority": TaskPriorityEnum.MEDIUM.value,
+        "tags": ["research", "market-analysis"],
+        "position": 1
+    }),
+    (3, {  # Due in 3 days
+        "title": "Create Outline",
+        "description": "Draft the structure in tasks.md using the Checklist section.",
+        "status": TaskStatusEnum.TODO.value,
+        "priority": TaskPriorityEnum.MEDIUM.value,
+        "tags": ["planning", "structure"],
+        "position": 2
+    }),
+
+    # --- IN PROGRESS COLUMN (1 Task) ---
+    (0, {  # Due today (Urgent)
+        "title": "Write First Draft",
+        "description": "Start writing the script in voiceover.md. Focus on the introduction first.",
+        "status": TaskStatusEnum.IN_PROGRESS.value,
+        "priority": TaskPriorityEnum.HIGH.value,
+        "tags": ["writing", "core-work"],
+        "position": 0
+    }),
+
+    # --- REVIEW COLUMN (1 Task) ---
+    (5, {  # Due next week
+        "title": "Self Review",
+        "description": "Read through the draft out loud to check for flow and timing.",
+        "status": TaskStatusEnum.REVIEW.value,
+        "priority": TaskPriorityEnum.LOW.value,
+        "tags": ["editing", "quality-control"],
+        "position": 0
+    }),
+
+    # --- DONE COLUMN (1 Task) ---
+    (0, {  # Done today
+        "title": "Setup Notebook",
+        "description": "Notebook initialized with default templates and folder structure.",
+        "status": TaskStatusEnum.DONE.value,
+        "priority": TaskPriorityEnum.LOW.value,
+        "tags": ["system", "setup"],
+        "position": 0
+    }),
+)
+
+# The definitions are static, so they are validated into requests once at import;
+# per notebook only the due date is filled in, via model_copy (no re-validation)
+_TEMPLATE_TASK_SPECS: Tuple[Tuple[int, TaskCreateRequest], ...] = tuple(
+    (due_in_days, TaskCreateRequest(**fields)) for due_in_days, fields in _TEMPLATE_TASK_DEFINITIONS
+)
+
 
 class NotebookTemplateService:
     """
@@ -28,186 +113,95 @@ class NotebookTemplateService:
     async def apply_content_creation_template(
             self,
             user_id: str,
-            notebook_id: str
+            notebook_id: uuid.UUID
     ) -> None:
         """
         Apply the content creation template to a notebook.
         Creates root-level files, Resources folder, and Kanban tasks.
+        The steps share the caller's session so the notebook and its template are
+        committed (or rolled back) together. An AsyncSession (and its single asyncpg
+        connection) can't run statements concurrently, so the steps are awaited in
+        turn; their cost is kept down by batching each step's inserts instead.
         """
-        try:
-            print(f"[TEMPLATE DEBUG] Applying to notebook {notebook_id}...")
-
-            # Step 1: Create root-level markdown files
-            await self._create_root_level_files(user_id, notebook_id)
-            print("[TEMPLATE DEBUG] Root files created.")
-
-            # Step 2: Create Resources folder with links.md
-            await self._create_resources_folder(user_id, notebook_id)
-            print("[TEMPLATE DEBUG] Folder created.")
-
-            # Step 3: Create template Kanban tasks
-            await self._create_template_tasks(user_id, notebook_id)
-            print("[TEMPLATE DEBUG] Tasks created.")
+        logger.debug("Applying content creation template to notebook %s", notebook_id)
 
-            # Ensure everything is flushed to the session before returning
-            await self.session.flush()
+        # Step 1: Create Resources folder (its ID is needed for links.md)
+        resources_folder_id = await self._create_resources_folder(user_id, notebook_id)
+        logger.debug("Template folder created for notebook %s", notebook_id)
 
-        except Exception as e:
-            # Re-raise to allow transaction rollback or logging in parent
-            print(f"[TEMPLATE DEBUG] Error in service: {e}")
-            raise e
+        # Step 2: Create root-level markdown files and Resources/links.md
+        await self._create_template_files(user_id, notebook_id, resources_folder_id)
+        logger.debug("Template files created for notebook %s", notebook_id)
 
-    async def _create_root_level_files(
-            self,
-            user_id: str,
-            notebook_id: str
-    ) -> None:
-        """Create tasks.md and voiceover.md at notebook root."""
-        root_files = ["tasks.md", "voiceover.md"]
-
-        for filename in root_files:
-            unique_filename = self.file_service.generate_unique_filename(filename)
-            content = self._get_template_content(filename)
-
-            await self.file_service.create_file_record(
-                user_id=user_id,
-                filename=filename,
-                unique_filename=unique_filename,
-                content=content,
-                content_type="text/markdown",
-                notebook_id=notebook_id,
-                folder_id=None
-            )
+        # Step 3: Create template Kanban tasks
+        await self._create_template_tasks(user_id, notebook_id)
+        logger.debug("Template tasks created for notebook %s", notebook_id)
 
     async def _create_resources_folder(
             self,
             user_id: str,
-            notebook_id: str
-    ) -> None:
-        """Create Resources folder with links.md file inside."""
-        folder = await self.folder_service.create_folder(
+            notebook_id: uuid.UUID
+    ) -> Optional[uuid.UUID]:
+        """Create the Resources folder at notebook root and return its ID."""
+        # Core INSERT ... RETURNING id: executed immediately, so no flush is needed
+        # before links.md references it (and nothing is committed)
+        folder_id = await self.folder_service.create_folder_record(
             user_id=user_id,
             notebook_id=notebook_id,
             name="Resources",
             parent_id=None
         )
 
-        await self.session.flush()
+        if not folder_id:
+            logger.warning("Folder creation returned no ID for notebook %s", notebook_id)
+            return None
+        return folder_id
 
-        if not folder or not folder.id:
-            print("[TEMPLATE DEBUG] Warning: Folder creation returned no object or ID")
-            return
-
-        filename = "links.md"
-        unique_filename = self.file_service.generate_unique_filename(filename)
-        content = self._get_template_content(filename)
+    async def _create_template_files(
+            self,
+            user_id: str,
+            notebook_id: uuid.UUID,
+            resources_folder_id: Optional[uuid.UUID]
+    ) -> None:
+        """Create tasks.md and voiceover.md at notebook root and links.md inside Resources, in one INSERT."""
+        placements = [("tasks.md", None), ("voiceover.md", None)]
+        if resources_folder_id:
+            placements.append(("links.md", resources_folder_id))
 
-        await self.file_service.create_file_record(
-            user_id=user_id,
-            filename=filename,
-            unique_filename=unique_filename,
-            content=content,
-            content_type="text/markdown",
-            notebook_id=notebook_id,
-            folder_id=str(folder.id)
-        )
+        await self.file_service.create_file_records_bulk([
+            {
+                **_TEMPLATE_FILE_COLUMNS[filename],
+                "user_id": user_id,
+                "unique_filename": self.file_service.generate_unique_filename(filename),
+                "notebook_id": notebook_id,
+                "folder_id": folder_id
+            }
+            for filename, folder_id in placements
+        ])
 
     async def _create_template_tasks(
             self,
             user_id: str,
-            notebook_id: str
+            notebook_id: uuid.UUID
     ) -> None:
         """Create pre-populated Kanban tasks across all columns."""
-        task_definitions = self._get_template_tasks()
-
-        for task_def in task_definitions:
-            task_request = TaskCreateRequest(**task_def)
-
-            await self.task_service.create_task(
-                user_id=user_id,
-                notebook_id=notebook_id,
-                task_data=task_request
-            )
-
-    @staticmethod
-    def _get_template_content(filename: str) -> str:
-        templates = {
-            "tasks.md": """# Task Planning\n\n## Project Goals\nDefine what you want to achieve with this project.\n\n## Checklist\n- [ ] Brainstorm ideas\n- [ ] Conduct research\n- [ ] Draft content\n- [ ] Review and refine\n\n## Notes\n- Deadline: TBD\n- Priority: High\n""",
-            "voiceover.md": """# Voiceover Script\n\n## Introduction (0:00 - 0:30)\n**Speaker:** "Hello and welcome to..."\n\n## Key Point 1 (0:30 - 2:00)\n**Speaker:** "The most important thing to remember is..."\n\n## Conclusion (2:00 - End)\n**Speaker:** "Thank you for watching."\n""",
-            "links.md": """# Resources\n\n## References\n- [Google](https://google.com)\n- [Research Paper](https://example.com)\n\n## Media Assets\n- [Images](https://unsplash.com)\n- [Icons](https://lucide.dev)\n"""
-        }
-
-        return templates.get(filename, "# New File\n")
+        # One INSERT for the whole board; the template already carries each column's positions
+        await self.task_service.create_tasks_bulk(
+            user_id=user_id,
+            notebook_id=notebook_id,
+            tasks_data=self._get_template_tasks()
+        )
 
     @staticmethod
-    def _get_template_tasks() -> List[Dict[str, Any]]:
+    def _get_template_tasks() -> List[TaskCreateRequest]:
         """
-        Get template task definitions for the Kanban board.
-        Returns: List of task dictionaries with all required fields.
+        Get template task requests for the Kanban board.
+        Returns: List of pre-validated task requests, due dates relative to today.
         """
         # FIX: Use date.today() instead of datetime.now()
         today = date.today()
 
         return [
-            # --- TO DO COLUMN (3 Tasks) ---
-            {
-                "title": "Initial Brainstorming",
-                "description": "Come up with 5 solid ideas for the content. Focus on audience engagement.",
-                "status": TaskStatusEnum.TODO.value,
-                "priority": TaskPriorityEnum.HIGH.value,
-                "due_date": today + timedelta(days=1),  # Due tomorrow
-                "tags": ["planning", "creative"],
-                "position": 0
-            },
-            {
-                "title": "Market Research",
-                "description": "Analyze competitors and gather reference links in Resources/links.md.",
-                "status": TaskStatusEnum.TODO.value,
-                "priority": TaskPriorityEnum.MEDIUM.value,
-                "due_date": today + timedelta(days=2),  # Due in 2 days
-                "tags": ["research", "market-analysis"],
-                "position": 1
-            },
-            {
-                "title": "Create Outline",
-                "description": "Draft the structure in tasks.md using the Checklist section.",
-                "status": TaskStatusEnum.TODO.value,
-                "priority": TaskPriorityEnum.MEDIUM.value,
-                "due_date": today + timedelta(days=3),  # Due in 3 days
-                "tags": ["planning", "structure"],
-                "position": 2
-            },
-
-            # --- IN PROGRESS COLUMN (1 Task) ---
-            {
-                "title": "Write First Draft",
-                "description": "Start writing the script in voiceover.md. Focus on the introduction first.",
-                "status": TaskStatusEnum.IN_PROGRESS.value,
-                "priority": TaskPriorityEnum.HIGH.value,
-                "due_date": today,  # Due today (Urgent)
-                "tags": ["writing", "core-work"],
-                "position": 0
-            },
-
-            # --- REVIEW COLUMN (1 Task) ---
-            {
-                "title": "Self Review",
-                "description": "Read through the draft out loud to check for flow and timing.",
-                "status": TaskStatusEnum.REVIEW.value,
-                "priority": TaskPriorityEnum.LOW.value,
-                "due_date": today + timedelta(days=5),  # Due next week
-                "tags": ["editing", "quality-control"],
-                "position": 0
-            },
-
-            # --- DONE COLUMN (1 Task) ---
-            {
-                "title": "Setup Notebook",
-                "description": "Notebook initialized with default templates and folder structure.",
-                "status": TaskStatusEnum.DONE.value,
-                "priority": TaskPriorityEnum.LOW.value,
-                "due_date": today,  # Done today
-                "tags": ["system", "setup"],
-                "position": 0
-            }
-        ]
\ No newline at end of file
+            request.model_copy(update={"due_date": today + timedelta(days=due_in_days)})
+            for due_in_days, request in _TEMPLATE_TASK_SPECS
+        ]
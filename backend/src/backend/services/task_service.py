@@ -1,5 +1,7 @@
+import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime, date
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.models.task import Task, TaskStatus, TaskPriority
@@ -108,6 +110,39 @@ class TaskService:
 
         return task_record
 
+    async def create_tasks_bulk(
+        self,
+        user_id: str,
+        notebook_id: uuid.UUID,
+        tasks_data: List[TaskCreateRequest]
+    ) -> List[Row]:
+        """
+        Create several tasks with a single INSERT, applying the same validation as
+        create_task. Meant for seeding a board (e.g. a new notebook's template), so
+        each task keeps the position it was given instead of being appended.
+        Returns the (id, created_at) rows from RETURNING, in input order.
+        Does not commit: the caller owns the transaction.
+        """
+        rows = []
+        for task_data in tasks_data:
+            title = task_data.title.strip()
+            if not title:
+                raise ValueError("Task title cannot be empty")
+
+            rows.append({
+                "user_id": user_id,
+                "notebook_id": notebook_id,
+                "title": title,
+                "description": task_data.description.strip() if task_data.description else None,
+                "status": self.validate_task_status(task_data.status.value) if task_data.status else TaskStatus.TODO,
+                "priority": self.validate_task_priority(task_data.priority.value) if task_data.priority else TaskPriority.MEDIUM,
+                "tags": self.sanitize_tags(task_data.tags) if task_data.tags else [],
+                "due_date": self.validate_due_date(task_data.due_date) if task_data.due_date else None,
+                "position": task_data.position or 0
+            })
+
+        return await self.repo.create_many(rows)
+
     async def get_tasks_for_user(
         self,
         user_id: str,
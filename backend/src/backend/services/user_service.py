@@ -76,7 +76,7 @@ class UserService:
 
         # 2. Call LiteLLM to generate a Virtual Key (Free Tier)
         # Note: We cast UUID to str for the API call
-        virtual_key = self.litellm_service.generate_key_for_user(
+        virtual_key = await self.litellm_service.generate_key_for_user(
             user_id=str(new_user.user_id),
             plan_name="free",
             email=email